@@ -1,23 +1,34 @@
 import random
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Annotated
 
+from app.services import UserService, get_user_service
 from fastapi import Depends, Header, HTTPException, status
 
 # ===== Function-based Dependencies =====
 
-def get_current_user() -> dict[str, str]:
+# Simulated users, built once and shared across requests; read-only views
+# so no caller can mutate what every other request sees
+_ADMIN_USER: Mapping[str, str] = MappingProxyType({
+    "username": "admin",
+    "account_type": "admin",
+    "status": "active",
+})
+_STANDARD_USER: Mapping[str, str] = MappingProxyType({
+    "username": "standard",
+    "account_type": "standard",
+    "status": "active",
+})
+
+
+async def get_current_user() -> Mapping[str, str]:
     """
     Dependency to get the current authenticated user.
     In a real app, this would extract the user from JWT token or session.
     """
     # Simulated authentication - randomly pick a user
-    user_types = ["admin", "standard"]
-    random_user = random.choice(user_types)
-    
-    return {
-        "username": random_user,
-        "account_type": random_user,
-        "status": "active",
-    }
+    return _ADMIN_USER if random.random() < 0.5 else _STANDARD_USER
 
 
 # ===== Class-based Dependencies =====
@@ -25,50 +36,90 @@ def get_current_user() -> dict[str, str]:
 class Settings:
     """Application settings"""
     
-    def __init__(self):
-        self.app_name = "DI Demo App"
-        self.version = "1.0.0"
+    app_name: str = "DI Demo App"
+    version: str = "1.0.0"
+
+
+# Built once at import time and shared by every request
+_SETTINGS = Settings()
 
 
-def get_settings() -> Settings:
+async def get_settings() -> Settings:
     """
     Dependency to get application settings.
     In a real app, this would load from environment variables or config files.
     """
-    return Settings()
+    return _SETTINGS
 
 
 # ===== Nested Dependencies (Chain) =====
 
-def verify_token(authorization: str = Header(None)) -> dict[str, str]:
+# Simulated token store - with only two tokens, straight comparisons beat a
+# hash lookup; entries are read-only so they can be shared
+_ADMIN_TOKEN = "admin-token-123"
+_USER_TOKEN = "user-token-456"
+_ADMIN_TOKEN_INFO: Mapping[str, str] = MappingProxyType({"username": "admin", "role": "admin"})
+_USER_TOKEN_INFO: Mapping[str, str] = MappingProxyType({"username": "john_doe", "role": "user"})
+
+# Auth failures are built once and re-raised. with_traceback(None) only stops
+# the traceback growing across raises: until the next failure the shared
+# instance still holds the last failed request's frames, and concurrent
+# failures overwrite each other's __traceback__. That is acceptable here since
+# it's at most one request's frames, and the exception handler only reads
+# status_code, detail and headers.
+_UNAUTHORIZED = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Invalid or missing authentication token",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+_FORBIDDEN = HTTPException(
+    status_code=status.HTTP_403_FORBIDDEN,
+    detail="Admin privileges required",
+)
+
+
+async def verify_token(authorization: str = Header(None)) -> Mapping[str, str]:
     """
     First level: Verify authentication token from header.
     In a real app, this would validate JWT tokens.
     """
     # Simulated token validation
-    valid_tokens = {
-        "admin-token-123": {"username": "admin", "role": "admin"},
-        "user-token-456": {"username": "john_doe", "role": "user"},
-    }
-    
-    if not authorization or authorization not in valid_tokens:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or missing authentication token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    return valid_tokens[authorization]
+    if authorization == _ADMIN_TOKEN:
+        return _ADMIN_TOKEN_INFO
+    if authorization == _USER_TOKEN:
+        return _USER_TOKEN_INFO
+    raise _UNAUTHORIZED.with_traceback(None)
 
 
-def verify_admin(current_user: dict = Depends(verify_token)) -> dict[str, str]:
+async def verify_admin(current_user: Mapping[str, str] = Depends(verify_token)) -> Mapping[str, str]:
     """
     Second level: Verify user is admin (depends on verify_token).
     This creates a dependency chain: verify_admin → verify_token
     """
     if current_user.get("role") != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin privileges required"
-        )
+        raise _FORBIDDEN.with_traceback(None)
     return current_user
+
+
+# ===== Single-step Admin Check (Router-level) =====
+
+async def verify_admin_inline(authorization: str = Header(None)) -> Mapping[str, str]:
+    """
+    Verify the token and admin role in one dependency.
+    Same checks as verify_admin → verify_token, but resolves as a single
+    node, so router-wide guards don't pay for walking the chain.
+    """
+    # Plain call, not Depends - reuses the token check without adding a node
+    token_info = await verify_token(authorization)
+    
+    if token_info["role"] != "admin":
+        raise _FORBIDDEN.with_traceback(None)
+    return token_info
+
+
+# ===== Reusable Annotated Dependencies =====
+
+CurrentUserDep = Annotated[Mapping[str, str], Depends(get_current_user)]
+SettingsDep = Annotated[Settings, Depends(get_settings)]
+UserServiceDep = Annotated[UserService, Depends(get_user_service)]
+AdminDep = Annotated[Mapping[str, str], Depends(verify_admin)]
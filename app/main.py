@@ -1,53 +1,82 @@
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+from app.middleware import LogRequestMiddleware
 from app.routers import admin, users
-from fastapi import Depends, FastAPI, Request
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 
-# ===== Global Dependency Example =====
+# ===== Logging =====
 
-def log_request(request: Request):
-    """
-    Global dependency: Applied to all routes in the application.
-    Useful for logging, rate limiting, or monitoring.
-    """
-    print(f"📝 Request: {request.method} {request.url.path}")
-    # In production, use proper logging:
-    # logger.info(f"{request.method} {request.url.path} - {request.client.host}")
-    return True
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking or erroring when full"""
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+# Request handlers only enqueue records; a background thread does the writing.
+# The listener runs from import until interpreter exit, so logging works even
+# when the app is served without lifespan events.
+_log_queue: queue.Queue = queue.Queue(maxsize=10_000)
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+logger = logging.getLogger("app")
+logger.setLevel(logging.INFO)
+logger.addHandler(_DroppingQueueHandler(_log_queue))
 
 
-# Create app with global dependency
 app = FastAPI(
     title="FastAPI Dependency Injection Example",
     description="Demonstrating all DI patterns: function-based, class-based, nested, router-level, and global",
     version="1.0.0",
-    dependencies=[Depends(log_request)]  # 👈 Applied to ALL routes globally
+    default_response_class=ORJSONResponse,
 )
 
+# ===== Global Middleware Example =====
+
+# Runs for ALL routes, outside the dependency graph
+app.add_middleware(LogRequestMiddleware)
+
 # Include routers
 app.include_router(users.router)
 app.include_router(admin.router)
 
 
+# Static root payload, serialized once at import time; clients and proxies
+# may reuse it for an hour
+_HOME_HEADERS = {"Cache-Control": "public, max-age=3600"}
+_HOME_BYTES = orjson.dumps({
+    "message": "FastAPI Dependency Injection Demo",
+    "features": {
+        "function_based": "get_current_user, get_settings",
+        "class_based": "Settings, UserService",
+        "nested": "verify_admin → verify_token",
+        "router_level": "/admin routes require admin auth",
+        "global": "LogRequestMiddleware runs on all routes"
+    },
+    "endpoints": {
+        "basic": "/users/profile",
+        "nested_dependency": "/users/dashboard (Header: Authorization: admin-token-123)",
+        "router_level": "/admin/stats (Header: Authorization: admin-token-123)",
+        "docs": "/docs"
+    }
+})
+
+
 @app.get("/", tags=["Root"])
-def home():
+async def home():
     """
     Root endpoint.
     
-    Note: log_request dependency runs automatically for this route too!
+    Note: LogRequestMiddleware runs automatically for this route too!
     """
-    return {
-        "message": "FastAPI Dependency Injection Demo",
-        "features": {
-            "function_based": "get_current_user, get_settings",
-            "class_based": "Settings, UserService",
-            "nested": "verify_admin → verify_token",
-            "router_level": "/admin routes require admin auth",
-            "global": "log_request runs on all routes"
-        },
-        "endpoints": {
-            "basic": "/users/profile",
-            "nested_dependency": "/users/dashboard (Header: Authorization: admin-token-123)",
-            "router_level": "/admin/stats (Header: Authorization: admin-token-123)",
-            "docs": "/docs"
-        }
-    }
-
+    return Response(content=_HOME_BYTES, media_type="application/json", headers=_HOME_HEADERS)
@@ -0,0 +1,28 @@
+"""
+Pure ASGI middleware.
+Cross-cutting concerns live here instead of in the dependency graph,
+so they cost one function call per request rather than a dependency solve.
+"""
+import logging
+from collections.abc import Iterable
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+# Schema and docs traffic isn't worth a log line
+DEFAULT_EXCLUDED_PATHS = frozenset({"/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json"})
+
+
+class LogRequestMiddleware:
+    """Log the method and path of every HTTP request, except excluded paths"""
+    
+    def __init__(self, app: ASGIApp, exclude_paths: Iterable[str] = DEFAULT_EXCLUDED_PATHS):
+        self.app = app
+        self.exclude_paths = frozenset(exclude_paths)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["path"] not in self.exclude_paths:
+            logger.info("Request: %s %s", scope["method"], scope["path"])
+        await self.app(scope, receive, send)
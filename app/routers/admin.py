@@ -2,40 +2,56 @@
 Admin router demonstrating router-level dependencies.
 All routes in this router automatically require admin authentication.
 """
-from app.dependencies import verify_admin
-from app.services import UserService
-from fastapi import APIRouter, Depends
+from app.dependencies import UserServiceDep, verify_admin_inline
+from fastapi import APIRouter, Depends, Header, Response, status
 
 # Router-level dependency: Applied to ALL routes in this router
 router = APIRouter(
     prefix="/admin",
     tags=["Admin"],
-    dependencies=[Depends(verify_admin)]  # 👈 ALL routes require admin auth
+    dependencies=[Depends(verify_admin_inline)]  # 👈 ALL routes require admin auth
 )
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak If-None-Match comparison (RFC 9110 §13.1.2): ignore any W/ prefix"""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
 @router.get("/stats")
-def get_system_stats(user_service: UserService = Depends(UserService)):
+async def get_system_stats(
+    user_service: UserServiceDep,
+    if_none_match: str | None = Header(None),
+):
     """
     Get system statistics (admin only).
     
-    No need to add verify_admin dependency here - 
+    No need to add verify_admin_inline dependency here - 
     it's automatically applied via router-level dependency!
     
+    Responds with an ETag; repeat the request with If-None-Match
+    to get an empty 304 while the stats are unchanged.
+    
     Try with header: Authorization: admin-token-123
     """
-    users_data = user_service.users
-    return {
-        "total_users": len(users_data),
-        "user_types": {
-            "admin": sum(1 for u in users_data.values() if u["account_type"] == "admin"),
-            "standard": sum(1 for u in users_data.values() if u["account_type"] == "standard"),
-        }
-    }
+    headers = {"ETag": user_service.stats_etag}
+    if _etag_matches(if_none_match, user_service.stats_etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=user_service.stats_json, media_type="application/json", headers=headers)
 
 
 @router.get("/users/list")
-def list_all_users(user_service: UserService = Depends(UserService)):
+async def list_all_users(user_service: UserServiceDep):
     """
     List all users in the system (admin only).
     
@@ -44,8 +60,5 @@ def list_all_users(user_service: UserService = Depends(UserService)):
     
     Try with header: Authorization: admin-token-123
     """
-    return {
-        "users": list(user_service.users.values()),
-        "count": len(user_service.users)
-    }
+    return Response(content=user_service.user_list_json, media_type="application/json")
 
@@ -1,15 +1,14 @@
-from app.dependencies import Settings, get_current_user, get_settings, verify_admin
-from app.services import UserService
-from fastapi import APIRouter, Depends
+from app.dependencies import AdminDep, CurrentUserDep, SettingsDep, UserServiceDep
+from fastapi import APIRouter
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/profile")
-def user_profile(
-    user: dict = Depends(get_current_user),
-    settings: Settings = Depends(get_settings),
-    user_service: UserService = Depends(UserService),
+async def user_profile(
+    user: CurrentUserDep,
+    settings: SettingsDep,
+    user_service: UserServiceDep,
 ):
     """
     Get the current user's profile.
@@ -17,7 +16,7 @@ def user_profile(
     Demonstrates multiple dependency injection:
     - get_current_user: Function-based dependency (authentication)
     - get_settings: Function returning class instance (configuration)
-    - UserService: Direct class injection (business logic)
+    - get_user_service: Cached provider for the shared UserService (business logic)
     """
     data = user_service.fetch_user_data(user["username"])
     return {
@@ -28,9 +27,9 @@ def user_profile(
 
 
 @router.get("/dashboard")
-def user_dashboard(
-    admin: dict = Depends(verify_admin),
-    user_service: UserService = Depends(UserService),
+async def user_dashboard(
+    admin: AdminDep,
+    user_service: UserServiceDep,
 ):
     """
     Admin dashboard endpoint demonstrating nested dependencies.
@@ -44,5 +43,5 @@ def user_dashboard(
         "message": f"Welcome to admin dashboard, {admin['username']}!",
         "role": admin["role"],
         "total_users": len(user_service.users),
-        "all_users": list(user_service.users.keys())
+        "all_users": user_service.usernames
     }
@@ -1,22 +1,73 @@
+import hashlib
+from collections import Counter
+from collections.abc import Mapping
+from types import MappingProxyType
+
+import orjson
+
+
 class UserService:
     """Service for handling user operations"""
     
-    def __init__(self):
-        # Simulated database
-        self.users: dict[str, dict[str, str]] = {
-            "admin": {
-                "username": "admin",
-                "account_type": "admin",
-                "status": "active",
-            },
-            "standard": {
-                "username": "standard",
-                "account_type": "standard",
-                "status": "active",
-            }
+    # Simulated database
+    _USERS: dict[str, dict[str, str]] = {
+        "admin": {
+            "username": "admin",
+            "account_type": "admin",
+            "status": "active",
+        },
+        "standard": {
+            "username": "standard",
+            "account_type": "standard",
+            "status": "active",
         }
+    }
+    
+    def __init__(self):
+        # Shallow copy so instances can add users without touching the shared table
+        self._users: dict[str, dict[str, str]] = dict(UserService._USERS)
+        # Read-only view: writes must go through add_user() so the cached
+        # views below are rebuilt
+        self.users: Mapping[str, dict[str, str]] = MappingProxyType(self._users)
+        self._refresh()
+    
+    def _refresh(self) -> None:
+        """Rebuild derived views; only needed when the database changes"""
+        self.user_list: list[dict[str, str]] = list(self.users.values())
+        # Column views for the fields that are read: usernames for the dashboard,
+        # account types for the counts (a flat tuple instead of nested dicts)
+        self.usernames: tuple[str, ...] = tuple(self.users)
+        self.account_types: tuple[str, ...] = tuple(u["account_type"] for u in self.user_list)
+        self.type_counts: Counter[str] = Counter(self.account_types)
+        self.user_list_json: bytes = orjson.dumps({
+            "users": self.user_list,
+            "count": len(self.user_list),
+        })
+        self.stats_json: bytes = orjson.dumps({
+            "total_users": len(self.users),
+            "user_types": dict(self.type_counts),
+        })
+        self.stats_etag: str = f'"{hashlib.blake2b(self.stats_json, digest_size=8).hexdigest()}"'
+    
+    def add_user(self, user: dict[str, str]) -> None:
+        """Add or replace a user in the database"""
+        self._users[user["username"]] = user
+        self._refresh()
     
     def fetch_user_data(self, username: str) -> dict[str, str] | None:
         """Fetch user data from the database"""
-        return self.users.get(username)
+        return self._users.get(username)
+
+
+# Built once at import time and handed out by get_user_service
+_USER_SERVICE = UserService()
+
 
+async def get_user_service() -> UserService:
+    """
+    Dependency to get the shared UserService instance.
+    An explicit zero-argument provider, so FastAPI has no constructor
+    signature to inspect and nothing is built per request; async so it
+    resolves on the event loop without a threadpool hop.
+    """
+    return _USER_SERVICE
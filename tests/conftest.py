@@ -0,0 +1,17 @@
+import pytest
+from app.main import app
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient (and one app startup) shared by the whole test session"""
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(autouse=True)
+def _clear_overrides():
+    """Reset dependency overrides after every test so mocks never leak"""
+    yield
+    app.dependency_overrides.clear()
@@ -1,9 +1,14 @@
-from app.dependencies import get_current_user, verify_admin, verify_token
-from app.main import app
-from app.services import UserService
-from fastapi.testclient import TestClient
+import asyncio
+import logging
+import queue
+from types import MappingProxyType
 
-client = TestClient(app)
+import pytest
+
+from app import dependencies
+from app.dependencies import get_current_user, verify_admin, verify_admin_inline
+from app.main import _DroppingQueueHandler, app
+from app.services import UserService, get_user_service
 
 
 # ===== Mock Functions =====
@@ -31,20 +36,20 @@ class MockUserService(UserService):
     def __init__(self):
         super().__init__()
         # Add test user to the mock database
-        self.users["test-user"] = {
+        self.add_user({
             "username": "test-user",
             "account_type": "standard",
             "status": "active"
-        }
+        })
 
 
 # ===== Tests =====
 
-def test_profile():
+def test_profile(client):
     """Test basic endpoint with function and class dependencies"""
     # Override dependencies with mocks
     app.dependency_overrides[get_current_user] = fake_user
-    app.dependency_overrides[UserService] = MockUserService
+    app.dependency_overrides[get_user_service] = MockUserService
     
     response = client.get("/users/profile")
     data = response.json()
@@ -53,53 +58,107 @@ def test_profile():
     assert data["profile"]["username"] == "test-user"
     assert data["profile"]["account_type"] == "standard"
     assert data["app"] == "DI Demo App"
-    
-    # Clean up
-    app.dependency_overrides = {}
 
 
-def test_admin_dashboard_with_nested_dependency():
+def test_admin_dashboard_with_nested_dependency(client):
     """Test nested dependencies (verify_admin → verify_token)"""
     # Override the nested dependency chain
     app.dependency_overrides[verify_admin] = fake_admin
-    app.dependency_overrides[UserService] = MockUserService
+    app.dependency_overrides[get_user_service] = MockUserService
     
     response = client.get("/users/dashboard")
     data = response.json()
     
     assert response.status_code == 200
     assert data["role"] == "admin"
-    assert "total_users" in data
-    
-    # Clean up
-    app.dependency_overrides = {}
+    assert data["total_users"] == 3
+    assert "test-user" in data["all_users"]
 
 
-def test_admin_dashboard_unauthorized():
+def test_admin_dashboard_unauthorized(client):
     """Test nested dependency without admin access"""
     response = client.get("/users/dashboard")
     
     # Should fail without proper authentication
     assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_admin_dashboard_forbidden_for_user_token(client):
+    """Test nested dependency rejects a valid non-admin token"""
+    response = client.get("/users/dashboard", headers={"Authorization": "user-token-456"})
+    
+    # verify_token passes, verify_admin should refuse
+    assert response.status_code == 403
+
 
+def test_list_all_users(client):
+    """Test pre-serialized user list reflects the injected service"""
+    app.dependency_overrides[verify_admin_inline] = fake_admin
+    app.dependency_overrides[get_user_service] = MockUserService
+    
+    response = client.get("/admin/users/list")
+    data = response.json()
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert data["count"] == 3
+    assert {u["username"] for u in data["users"]} == {"admin", "standard", "test-user"}
 
-def test_router_level_dependency():
+
+def test_router_level_dependency(client):
     """Test router-level dependency (admin routes)"""
-    # Override verify_admin to allow access
-    app.dependency_overrides[verify_admin] = fake_admin
+    # Override verify_admin_inline to allow access
+    app.dependency_overrides[verify_admin_inline] = fake_admin
+    
+    response = client.get("/admin/stats")
+    data = response.json()
+    
+    assert response.status_code == 200
+    assert data["total_users"] == 2
+    assert data["user_types"] == {"admin": 1, "standard": 1}
+
+
+def test_stats_reflect_added_users(client):
+    """Test /admin/stats counts users the mock service added after construction"""
+    app.dependency_overrides[verify_admin_inline] = fake_admin
+    app.dependency_overrides[get_user_service] = MockUserService
     
     response = client.get("/admin/stats")
     data = response.json()
     
     assert response.status_code == 200
-    assert "total_users" in data
-    assert "user_types" in data
+    assert data["total_users"] == 3
+    assert data["user_types"] == {"admin": 1, "standard": 2}
+
+
+def test_stats_etag_not_modified(client):
+    """Test /admin/stats answers a matching If-None-Match with 304"""
+    app.dependency_overrides[verify_admin_inline] = fake_admin
+    
+    etag = client.get("/admin/stats").headers["ETag"]
+    response = client.get("/admin/stats", headers={"If-None-Match": etag})
+    
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_stats_etag_weak_and_list_forms(client):
+    """Test /admin/stats matches weak validators, ETag lists and *"""
+    app.dependency_overrides[verify_admin_inline] = fake_admin
+    
+    etag = client.get("/admin/stats").headers["ETag"]
+    
+    for value in (f"W/{etag}", f'"other", {etag}', f'"other", W/{etag}', "*"):
+        response = client.get("/admin/stats", headers={"If-None-Match": value})
+        assert response.status_code == 304, value
     
-    # Clean up
-    app.dependency_overrides = {}
+    response = client.get("/admin/stats", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
 
 
-def test_router_level_dependency_unauthorized():
+def test_router_level_dependency_unauthorized(client):
     """Test router-level dependency blocks unauthorized access"""
     response = client.get("/admin/stats")
     
@@ -107,10 +166,86 @@ def test_router_level_dependency_unauthorized():
     assert response.status_code == 401
 
 
-def test_global_dependency():
-    """Test that global dependency (log_request) doesn't break routes"""
-    response = client.get("/")
+def test_router_level_dependency_with_tokens(client):
+    """Test router-level dependency with real admin and non-admin tokens"""
+    response = client.get("/admin/stats", headers={"Authorization": "admin-token-123"})
+    assert response.status_code == 200
+    
+    response = client.get("/admin/stats", headers={"Authorization": "user-token-456"})
+    assert response.status_code == 403
+
+
+def test_admin_checks_follow_token_role(client, monkeypatch):
+    """Test both admin guards decide on the token's role, not the token string"""
+    monkeypatch.setattr(
+        dependencies, "_ADMIN_TOKEN_INFO", MappingProxyType({"username": "admin", "role": "user"})
+    )
+    headers = {"Authorization": "admin-token-123"}
+    
+    assert client.get("/admin/stats", headers=headers).status_code == 403
+    assert client.get("/users/dashboard", headers=headers).status_code == 403
+
+
+def test_global_middleware(client, caplog):
+    """Test that global middleware (LogRequestMiddleware) logs without breaking routes"""
+    with caplog.at_level(logging.INFO, logger="app"):
+        response = client.get("/")
     
-    # Global dependency should run but not affect response
+    # Global middleware should run but not affect response
     assert response.status_code == 200
     assert "message" in response.json()
+    assert response.headers["Cache-Control"] == "public, max-age=3600"
+    assert "Request: GET /" in caplog.messages
+
+
+def test_global_middleware_skips_docs(client, caplog):
+    """Test that schema and docs requests are not logged"""
+    with caplog.at_level(logging.INFO, logger="app"):
+        response = client.get("/openapi.json")
+    
+    assert response.status_code == 200
+    assert not any(m.startswith("Request:") for m in caplog.messages)
+
+
+def test_log_handler_drops_records_when_queue_full():
+    """Test a full log queue drops records instead of raising or blocking"""
+    log_queue = queue.Queue(maxsize=1)
+    handler = _DroppingQueueHandler(log_queue)
+    record = logging.LogRecord("app", logging.INFO, __file__, 0, "Request: GET /", None, None)
+    
+    handler.emit(record)
+    handler.emit(record)
+    
+    assert log_queue.qsize() == 1
+
+
+def test_current_user_is_read_only():
+    """Test the shared simulated user can't be mutated by a caller"""
+    user = asyncio.run(get_current_user())
+    
+    assert user["username"] in {"admin", "standard"}
+    with pytest.raises(TypeError):
+        user["username"] = "intruder"
+
+
+def test_fetch_user_data_sees_added_users():
+    """Test lookups reflect users added after the service was built"""
+    service = UserService()
+    assert service.fetch_user_data("late-user") is None
+    
+    service.add_user({"username": "late-user", "account_type": "standard", "status": "active"})
+    
+    assert service.fetch_user_data("late-user")["username"] == "late-user"
+
+
+def test_users_cannot_be_mutated_directly():
+    """Test direct writes fail instead of leaving the cached views stale"""
+    service = UserService()
+    
+    with pytest.raises(TypeError):
+        service.users["late-user"] = {"username": "late-user", "account_type": "standard", "status": "active"}
+
+
+def test_user_service_is_shared():
+    """Test the cached provider hands back the same UserService each call"""
+    assert asyncio.run(get_user_service()) is asyncio.run(get_user_service())